@@ -7,22 +7,46 @@ to generate banking data with custom prompts and examples.
 
 Usage:
     python api_example.py
+    python api_example.py --all-models
 """
 
+import argparse
+import asyncio
+import httpx
 import requests
 import json
+from functools import lru_cache
 from pathlib import Path
+from requests.adapters import HTTPAdapter
 
 
-def load_files():
-    """Load prompt and examples from files"""
-    script_dir = Path(__file__).parent
+SYNTHESIZE_URL = "http://localhost:8000/api/v1/synthesize"
+BATCH_SYNTHESIZE_URL = f"{SYNTHESIZE_URL}/batch"
+_SCRIPT_DIR = Path(__file__).parent
+
+
+# One keep-alive session for every call so repeated requests to the API
+# reuse pooled connections instead of reconnecting each time
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+_SESSION.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+
 
-    with open(script_dir / "custom_prompt.txt", 'r') as f:
-        custom_prompt = f.read()
+@lru_cache(maxsize=None)
+def _read_text(file_name: str) -> str:
+    """Read a file next to this script, once per process"""
+    return (_SCRIPT_DIR / file_name).read_text()
+
+
+@lru_cache(maxsize=1)
+def load_files():
+    """Load prompt and examples from files
 
-    with open(script_dir / "examples.json", 'r') as f:
-        examples = json.load(f)
+    The result is cached because several examples below call this; treat
+    the returned examples as read-only.
+    """
+    custom_prompt = _read_text("custom_prompt.txt")
+    examples = json.loads(_read_text("examples.json"))
 
     return custom_prompt, examples
 
@@ -76,8 +100,8 @@ def generate_banking_data():
     print(f"   Topics: {len(request_data['topics'])}")
 
     # Make API request
-    response = requests.post(
-        "http://localhost:8000/api/v1/synthesize",
+    response = _SESSION.post(
+        SYNTHESIZE_URL,
         json=request_data,
         timeout=300
     )
@@ -122,8 +146,8 @@ def generate_with_file_path():
         "is_demo": True
     }
 
-    response = requests.post(
-        "http://localhost:8000/api/v1/synthesize",
+    response = _SESSION.post(
+        SYNTHESIZE_URL,
         json=request_data,
         timeout=300
     )
@@ -176,22 +200,90 @@ def generate_with_different_models():
         "is_demo": True
     }
 
-    # Choose which config to use
     print("Model options:")
     print("1. Claude Sonnet (high quality)")
     print("2. Llama 90B (fast)")
     print("3. CAII (custom endpoint)")
 
-    return claude_sonnet_config  # Return example config
+    return [claude_sonnet_config, llama_config, caii_config]
+
+
+async def generate_all_variants(configs=None):
+    """Send every model variant concurrently and return results in order
+
+    Wall-clock time is that of the slowest variant rather than the sum of
+    all of them. Failed variants come back as None.
+    """
+    if configs is None:
+        configs = generate_with_different_models()
+
+    print(f"\n🚀 Sending {len(configs)} requests concurrently...")
+
+    limits = httpx.Limits(max_connections=16)
+    async with httpx.AsyncClient(timeout=300, limits=limits) as client:
+        responses = await asyncio.gather(
+            *(client.post(SYNTHESIZE_URL, json=config) for config in configs),
+            return_exceptions=True
+        )
+
+    results = []
+    for config, response in zip(configs, responses):
+        if isinstance(response, Exception):
+            print(f"❌ {config['model_id']}: request failed: {response}")
+            results.append(None)
+        elif response.status_code != 200:
+            print(f"❌ {config['model_id']}: request failed: {response.status_code}")
+            results.append(None)
+        else:
+            print(f"✅ {config['model_id']}: generation successful")
+            results.append(response.json())
+
+    return results
+
+
+def batch_synthesize(configs):
+    """Send several synthesize configs in one request
+
+    Posts ``{"requests": configs}`` to the batch endpoint so the per-call
+    HTTP and validation overhead is paid once. Servers without the batch
+    endpoint (404/405) are served by the concurrent fan-out instead.
+    Returns one result per config, in order; failed items are None, and
+    so are items missing from a short batch response.
+    """
+    print(f"\n📦 Sending {len(configs)} configs as one batch request...")
+
+    response = _SESSION.post(
+        BATCH_SYNTHESIZE_URL,
+        json={"requests": configs},
+        timeout=300
+    )
+
+    if response.status_code in (404, 405):
+        print("   Batch endpoint not available, falling back to concurrent requests")
+        return asyncio.run(generate_all_variants(configs))
+
+    if response.status_code != 200:
+        print(f"❌ Batch request failed: {response.status_code}")
+        print(response.text)
+        return [None] * len(configs)
+
+    results = response.json().get("results")
+    if not isinstance(results, list):
+        print("❌ Batch response has no results list")
+        return [None] * len(configs)
+
+    print(f"✅ Batch returned {len(results)} results")
+    if len(results) != len(configs):
+        print(f"⚠️  Expected {len(configs)} results; padding or trimming to match")
+        results = (results + [None] * len(configs))[:len(configs)]
+    return results
 
 
 def evaluate_generated_data(data_file: str):
     """Evaluate generated banking data"""
 
     # Load evaluation prompt
-    script_dir = Path(__file__).parent
-    with open(script_dir / "evaluation_prompt.txt", 'r') as f:
-        eval_prompt = f.read()
+    eval_prompt = _read_text("evaluation_prompt.txt")
 
     request_data = {
         "use_case": "custom",
@@ -207,7 +299,7 @@ def evaluate_generated_data(data_file: str):
 
     print(f"\n🔍 Evaluating data from: {data_file}")
 
-    response = requests.post(
+    response = _SESSION.post(
         "http://localhost:8000/api/v1/evaluate",
         json=request_data,
         timeout=300
@@ -232,11 +324,23 @@ def evaluate_generated_data(data_file: str):
 
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description="Banking data generation API example")
+    parser.add_argument(
+        "--all-models",
+        action="store_true",
+        help="Generate with every example model configuration concurrently"
+    )
+    args = parser.parse_args()
+
     print("=" * 60)
     print("🏦 Banking Multi-Dataset Generator - API Example")
     print("=" * 60)
     print()
 
+    if args.all_models:
+        batch_synthesize(generate_with_different_models())
+        return
+
     # Generate data
     result = generate_banking_data()
 
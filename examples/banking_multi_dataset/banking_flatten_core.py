@@ -0,0 +1,310 @@
+"""
+Shared DataFlattener for the banking multi-dataset examples
+
+Splits nested records (customer -> accounts -> transactions) into three CSV
+files with foreign key columns. Used by both flatten_to_csv.py and
+end_to_end_pipeline.py.
+
+Also provides the JSON helpers shared by the sibling scripts: loads(),
+load_file() and iter_records() for input, dumps() for output.
+
+Usage:
+    from banking_flatten_core import DataFlattener
+    flattener = DataFlattener("input.json", "output/")
+    flattener.flatten()
+"""
+
+import json
+import csv
+import io
+import mmap
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from pathlib import Path
+from types import MappingProxyType
+from typing import List, Dict, Any, BinaryIO, Iterator, Optional, Sequence
+
+
+# orjson is optional; fall back to the stdlib parser when it isn't installed.
+# orjson only accepts strict JSON, so input it rejects (such as the NaN and
+# Infinity that json.dumps writes) is re-parsed with the stdlib parser.
+# Unlike json.loads, orjson reads integers beyond 64 bits as floats; no
+# banking amount gets near that, and spotting them up front would cost
+# about a third of the parse time.
+try:
+    import orjson
+
+    def loads(raw: bytes) -> Any:
+        """Parse JSON bytes"""
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            return json.loads(raw)
+
+    def load_file(f: BinaryIO) -> Any:
+        """Parse a JSON file opened in binary mode"""
+        try:
+            # Parse straight from a read-only mapping of the file instead of
+            # copying it into a bytes object first (mmap can't map empty files)
+            if not os.fstat(f.fileno()).st_size:
+                return orjson.loads(f.read())
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, \
+                    memoryview(mapped) as view:
+                return orjson.loads(view)
+        except orjson.JSONDecodeError:
+            f.seek(0)
+            return json.loads(f.read())
+except ImportError:
+    def loads(raw: bytes) -> Any:
+        """Parse JSON bytes"""
+        return json.loads(raw)
+
+    def load_file(f: BinaryIO) -> Any:
+        """Parse a JSON file opened in binary mode"""
+        return json.loads(f.read())
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serialize obj to JSON bytes, indented by 2 or compact
+
+    Always uses the stdlib encoder, even when orjson is installed, so the
+    files written match what json.dump wrote byte for byte (orjson writes
+    non-ASCII characters unescaped and formats some floats differently).
+    """
+    if indent:
+        return json.dumps(obj, indent=2).encode()
+    return json.dumps(obj, separators=(',', ':')).encode()
+
+
+# ijson is optional; it streams top-level records instead of parsing the
+# whole file up front, and picks its C backend (yajl2_c) when available
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# What iter_records raises on input ijson rejects but load_file may accept
+# (NaN, Infinity, integers beyond 64 bits, as well as truly broken JSON);
+# callers catch it and re-read the file with load_file
+STREAMING_PARSE_ERRORS = (ijson.JSONError,) if ijson is not None else ()
+
+
+def iter_records(path: Path) -> Iterator[Dict[str, Any]]:
+    """Yield top-level records from a JSON array file one at a time"""
+    with open(path, 'rb') as f:
+        if ijson is None:
+            yield from load_file(f)
+        else:
+            yield from ijson.items(f, 'item', use_float=True)
+
+
+# Output buffer for CSV writes; large enough that write() syscalls are rare
+_CSV_BUFFER_SIZE = 1 << 20
+
+# Column order of the three output tables, matching the banking schema in
+# custom_prompt.txt. Fixing it up front saves scanning every row for keys.
+CUSTOMER_FIELDS = (
+    "cust_id", "first_name", "last_name", "date_of_birth", "email", "phone",
+    "address", "postal_code", "nationality", "region", "customer_since",
+    "customer_segment", "credit_score"
+)
+ACCOUNT_FIELDS = (
+    "account_id", "cust_id", "account_type", "account_status", "branch",
+    "open_date", "current_balance", "currency", "interest_rate",
+    "overdraft_limit"
+)
+TRANSACTION_FIELDS = (
+    "transaction_id", "account_id", "transaction_date", "transaction_time",
+    "transaction_type", "transaction_category", "amount", "merchant_name",
+    "description", "balance_after"
+)
+
+# Shared read-only defaults for missing record sections, so the hot loop
+# doesn't build a fresh empty dict/list for every record
+_EMPTY_DICT = MappingProxyType({})
+_EMPTY_TUPLE = ()
+
+# Rows checked before committing a CSV table to the hand-joined fast path
+_QUOTING_SAMPLE = 1000
+
+
+def _join_rows(records: Sequence[Dict[str, Any]], fieldnames: Sequence[str]) -> str:
+    """Join records into CRLF-terminated CSV lines without any quoting"""
+    return ''.join([
+        ','.join([
+            '' if value is None else str(value)
+            for value in map(record.get, fieldnames)
+        ]) + '\r\n'
+        for record in records
+    ])
+
+
+def _is_unquoted(text: str, rows: int, fields: int) -> bool:
+    """Whether _join_rows output is exactly what csv.writer would write
+
+    It is as long as no value holds a delimiter, quote or line break, i.e.
+    the text has one comma per separator and one CRLF per row, and no
+    quotes (csv.writer's only other quoting case, a lone empty field,
+    needs a single-column table).
+    """
+    return (text.count(',') == (fields - 1) * rows
+            and text.count('\r') == rows
+            and text.count('\n') == rows
+            and '"' not in text)
+
+
+# Serializes console output from the concurrent CSV writer threads so
+# their lines don't run into each other
+_print_lock = threading.Lock()
+
+
+def _locked_print(*args):
+    with _print_lock:
+        print(*args)
+
+
+class DataFlattener:
+    """Flattens nested JSON to CSV files"""
+
+    def __init__(self, input_file: str, output_dir: str):
+        self.input_file = Path(input_file) if input_file else None
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._data = None
+
+    @classmethod
+    def from_data(cls, data: List[Dict[str, Any]], output_dir: str) -> "DataFlattener":
+        """Create a flattener for records that have already been parsed"""
+        flattener = cls(None, output_dir)
+        flattener._data = data
+        return flattener
+
+    def flatten(self):
+        """Flatten nested JSON to three CSV files"""
+        data = self._data
+        if data is None:
+            # One whole-file parse; streaming the records through ijson was
+            # slower and saved little memory, since every customer, account
+            # and transaction is kept until the CSVs are written anyway
+            print(f"📂 Loading data from: {self.input_file}")
+            with open(self.input_file, 'rb') as f:
+                data = load_file(f)
+
+        return self._flatten_parsed(data)
+
+    def _flatten_parsed(self, data: List[Dict[str, Any]]):
+        """Flatten already-parsed records to three CSV files"""
+        customers = []
+        accounts = []
+        transactions = []
+
+        # Extract data from nested structure
+        print(f"🔄 Flattening data...")
+        for record in data:
+            # Customer data
+            customer = record.get("customer", _EMPTY_DICT)
+            customers.append(customer)
+
+            # Accounts data
+            record_accounts = record.get("accounts", _EMPTY_TUPLE)
+            accounts.extend(record_accounts)
+
+            # Transactions data - only those that belong to one of this
+            # customer's accounts, in a single pass over the transactions
+            account_ids = {account.get("account_id") for account in record_accounts}
+            transactions.extend(
+                transaction for transaction in record.get("transactions", _EMPTY_TUPLE)
+                if transaction.get("account_id") in account_ids
+            )
+
+        # Write CSV files
+        customers_file = self.output_dir / "customers.csv"
+        accounts_file = self.output_dir / "accounts.csv"
+        transactions_file = self.output_dir / "transactions.csv"
+
+        # The three tables are independent, so write them concurrently
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            list(executor.map(
+                self._write_csv,
+                (customers_file, accounts_file, transactions_file),
+                (customers, accounts, transactions),
+                (CUSTOMER_FIELDS, ACCOUNT_FIELDS, TRANSACTION_FIELDS)
+            ))
+
+        print(f"\n✅ Export complete!")
+        print(f"📊 Statistics:")
+        print(f"   Customers: {len(customers)}")
+        print(f"   Accounts: {len(accounts)}")
+        print(f"   Transactions: {len(transactions)}")
+        print(f"\n📁 Output files:")
+        print(f"   {customers_file}")
+        print(f"   {accounts_file}")
+        print(f"   {transactions_file}")
+
+        return {
+            "customers": str(customers_file),
+            "accounts": str(accounts_file),
+            "transactions": str(transactions_file),
+            "stats": {
+                "customers": len(customers),
+                "accounts": len(accounts),
+                "transactions": len(transactions)
+            }
+        }
+
+    def _write_csv(
+        self,
+        file_path: Path,
+        data: List[Dict[str, Any]],
+        fieldnames: Optional[Sequence[str]] = None
+    ):
+        """Write list of dicts to CSV file
+
+        With ``fieldnames`` the columns are fixed and keys outside them are
+        dropped (with a warning); otherwise every key found is written.
+        """
+        if not data:
+            _locked_print(f"⚠️  Warning: No data to write to {file_path}")
+            return
+
+        if fieldnames is None:
+            # Get all unique keys across all records, in first-seen order
+            fieldnames = list(dict.fromkeys(chain.from_iterable(data)))
+        else:
+            known = frozenset(fieldnames)
+            unexpected = sum(1 for record in data if not record.keys() <= known)
+            if unexpected:
+                _locked_print(
+                    f"⚠️  Warning: {unexpected} record(s) in {file_path.name} have "
+                    f"fields outside the schema; those fields were not written"
+                )
+
+        # Most tables need no quoting at all, so their rows are joined by
+        # hand. The header and the first rows decide the path up front; the
+        # joined text is then checked as a whole, and any table where a value
+        # would be quoted is written by csv.writer instead.
+        text = None
+        if len(fieldnames) > 1:
+            sample = data[:_QUOTING_SAMPLE]
+            text = ','.join(fieldnames) + '\r\n' + _join_rows(sample, fieldnames)
+            if _is_unquoted(text, len(sample) + 1, len(fieldnames)):
+                text += _join_rows(data[_QUOTING_SAMPLE:], fieldnames)
+                if not _is_unquoted(text, len(data) + 1, len(fieldnames)):
+                    text = None
+            else:
+                text = None
+
+        with open(file_path, 'wb', buffering=_CSV_BUFFER_SIZE) as raw:
+            if text is not None:
+                raw.write(text.encode())
+            else:
+                with io.TextIOWrapper(raw, encoding='utf-8', newline='') as f:
+                    writer = csv.writer(f)
+                    writer.writerow(fieldnames)
+                    writer.writerows(
+                        [record.get(field) for field in fieldnames] for record in data
+                    )
+
+        _locked_print(f"✓ Wrote {len(data)} records to {file_path.name}")
@@ -20,101 +20,22 @@ Usage:
     result = run_pipeline(input_file='data.json', output_dir='output/')
 """
 
-import json
-import csv
+import logging
 import os
 import sys
-import traceback
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable
 from datetime import datetime
 from collections import defaultdict
 
+from banking_flatten_core import DataFlattener, dumps, load_file, loads
 
-class DataFlattener:
-    """Flattens nested JSON to CSV files"""
 
-    def __init__(self, input_file: str, output_dir: str):
-        self.input_file = Path(input_file)
-        self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+logger = logging.getLogger(__name__)
 
-    def flatten(self):
-        """Flatten nested JSON to three CSV files"""
-        print(f"📂 Loading data from: {self.input_file}")
 
-        with open(self.input_file, 'r') as f:
-            data = json.load(f)
-
-        customers = []
-        accounts = []
-        transactions = []
-
-        # Extract data from nested structure
-        print(f"🔄 Flattening data...")
-        for record in data:
-            # Customer data
-            customer = record.get("customer", {})
-            customers.append(customer)
-
-            # Accounts data
-            for account in record.get("accounts", []):
-                accounts.append(account)
-
-                # Transactions data
-                for transaction in record.get("transactions", []):
-                    # Only include transactions for this account
-                    if transaction.get("account_id") == account.get("account_id"):
-                        transactions.append(transaction)
-
-        # Write CSV files
-        customers_file = self.output_dir / "customers.csv"
-        accounts_file = self.output_dir / "accounts.csv"
-        transactions_file = self.output_dir / "transactions.csv"
-
-        self._write_csv(customers_file, customers)
-        self._write_csv(accounts_file, accounts)
-        self._write_csv(transactions_file, transactions)
-
-        print(f"\n✅ Flattening complete!")
-        print(f"📊 Statistics:")
-        print(f"   Customers: {len(customers)}")
-        print(f"   Accounts: {len(accounts)}")
-        print(f"   Transactions: {len(transactions)}")
-        print(f"\n📁 Output files:")
-        print(f"   {customers_file}")
-        print(f"   {accounts_file}")
-        print(f"   {transactions_file}")
-
-        return {
-            "customers": str(customers_file),
-            "accounts": str(accounts_file),
-            "transactions": str(transactions_file),
-            "stats": {
-                "customers": len(customers),
-                "accounts": len(accounts),
-                "transactions": len(transactions)
-            }
-        }
-
-    def _write_csv(self, file_path: Path, data: List[Dict[str, Any]]):
-        """Write list of dicts to CSV file"""
-        if not data:
-            print(f"⚠️  Warning: No data to write to {file_path}")
-            return
-
-        # Get all unique keys across all records
-        fieldnames = set()
-        for record in data:
-            fieldnames.update(record.keys())
-        fieldnames = sorted(fieldnames)
-
-        with open(file_path, 'w', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(data)
-
-        print(f"✓ Wrote {len(data)} records to {file_path.name}")
+class PipelineError(RuntimeError):
+    """Raised when a pipeline stage fails"""
 
 
 class BankingDataValidator:
@@ -126,8 +47,13 @@ class BankingDataValidator:
         self.warnings = []
         self.stats = defaultdict(int)
 
-    def validate(self, data: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Validate banking data and return results"""
+    def validate(self, data: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """Validate banking data and return results
+
+        Makes a single pass over the records, so ``data`` may be a one-shot
+        iterator. Transaction references are checked once every account id
+        has been seen.
+        """
         print("🔍 Validating banking data...\n")
 
         # Collect all IDs for referential integrity checks
@@ -135,6 +61,10 @@ class BankingDataValidator:
         all_account_ids = set()
         all_transaction_ids = set()
 
+        # Account references of every transaction, resolved after the loop
+        ref_transaction_ids = []
+        ref_account_ids = []
+
         for record in data:
             customer = record.get("customer", {})
             accounts = record.get("accounts", [])
@@ -152,36 +82,41 @@ class BankingDataValidator:
                     all_account_ids.add(acc_id)
                     self.stats["accounts"] += 1
 
+            # Account-to-customer checks only need this record
+            self._validate_accounts(customer, accounts)
+
             for transaction in transactions:
                 trans_id = transaction.get("transaction_id")
                 if trans_id:
                     all_transaction_ids.add(trans_id)
                     self.stats["transactions"] += 1
 
-        # Run validation checks
-        for idx, record in enumerate(data):
-            self._validate_record(
-                idx, record, all_customer_ids, all_account_ids, all_transaction_ids
-            )
+                acc_id = transaction.get("account_id")
+                if acc_id:
+                    ref_transaction_ids.append(trans_id)
+                    ref_account_ids.append(acc_id)
+
+        # Transactions may reference accounts from any record. The superset
+        # test runs in C; the references are only walked again to build
+        # error messages when some of them dangle.
+        if not all_account_ids.issuperset(ref_account_ids):
+            for trans_id, acc_id in zip(ref_transaction_ids, ref_account_ids):
+                if acc_id not in all_account_ids:
+                    self.errors.append(
+                        f"Transaction {trans_id} references "
+                        f"non-existent account {acc_id}"
+                    )
 
         return self._get_results()
 
-    def _validate_record(
+    def _validate_accounts(
         self,
-        idx: int,
-        record: Dict[str, Any],
-        all_customer_ids: set,
-        all_account_ids: set,
-        all_transaction_ids: set
+        customer: Dict[str, Any],
+        accounts: List[Dict[str, Any]]
     ):
-        """Validate a single customer record"""
-        customer = record.get("customer", {})
-        accounts = record.get("accounts", [])
-        transactions = record.get("transactions", [])
-
+        """Check that a customer's accounts reference that customer"""
         cust_id = customer.get("cust_id")
 
-        # Check for referential integrity
         for account in accounts:
             acc_cust_id = account.get("cust_id")
             if acc_cust_id and acc_cust_id != cust_id:
@@ -190,14 +125,6 @@ class BankingDataValidator:
                     f"expected {cust_id}, got {acc_cust_id}"
                 )
 
-        for transaction in transactions:
-            acc_id = transaction.get("account_id")
-            if acc_id and acc_id not in all_account_ids:
-                self.errors.append(
-                    f"Transaction {transaction.get('transaction_id')} references "
-                    f"non-existent account {acc_id}"
-                )
-
     def _get_results(self) -> Dict[str, Any]:
         """Return validation results"""
         passed = len(self.errors) == 0
@@ -229,8 +156,8 @@ class BankingDataValidator:
 
 def load_pipeline_config(config_file: str) -> Dict[str, Any]:
     """Load pipeline configuration from JSON file"""
-    with open(config_file, 'r') as f:
-        config = json.load(f)
+    with open(config_file, 'rb') as f:
+        config = loads(f.read())
     return config
 
 
@@ -251,6 +178,9 @@ def run_pipeline(
 
     Returns:
         Dictionary with pipeline results
+
+    Raises:
+        PipelineError: If any stage fails; the cause is logged and chained
     """
     try:
         print("=" * 70)
@@ -282,8 +212,8 @@ def run_pipeline(
         print("Stage 1: Data Validation")
         print("=" * 70)
 
-        with open(input_file, 'r') as f:
-            data = json.load(f)
+        with open(input_file, 'rb') as f:
+            data = load_file(f)
 
         validator = BankingDataValidator(verbose=verbose)
         validation_results = validator.validate(data)
@@ -295,7 +225,8 @@ def run_pipeline(
         print("=" * 70)
 
         csv_output_dir = output_path / "csv"
-        flattener = DataFlattener(input_file, str(csv_output_dir))
+        # Reuse the records parsed for validation instead of re-reading the file
+        flattener = DataFlattener.from_data(data, str(csv_output_dir))
         flatten_results = flattener.flatten()
         results["stages"]["flatten"] = flatten_results
 
@@ -319,10 +250,11 @@ def run_pipeline(
         print(f"     - {flatten_results['accounts']}")
         print(f"     - {flatten_results['transactions']}")
 
-        # Save results JSON
+        # Save results JSON - compact, since it is read back by downstream
+        # jobs; set PIPELINE_DEBUG_JSON=1 for an indented copy
         results_file = output_path / "pipeline_results.json"
-        with open(results_file, 'w') as f:
-            json.dump(results, f, indent=2)
+        with open(results_file, 'wb') as f:
+            f.write(dumps(results, indent=os.environ.get('PIPELINE_DEBUG_JSON') == '1'))
         print(f"\n   Results Summary: {results_file}")
 
         print("\n" + "=" * 70)
@@ -330,9 +262,8 @@ def run_pipeline(
         return results
 
     except Exception as e:
-        print(f"\n❌ Pipeline failed: {e}")
-        traceback.print_exc()
-        sys.exit(1)
+        logger.exception("❌ Pipeline failed: %s: %s", type(e).__name__, e)
+        raise PipelineError(str(e)) from e
 
 
 def run_cai_job():
@@ -346,8 +277,8 @@ def run_cai_job():
         print(f"Running as CAI job, reading parameters from: {file_name}")
 
         # Read JSON file
-        with open(file_name, 'r') as f:
-            params = json.load(f)
+        with open(file_name, 'rb') as f:
+            params = loads(f.read())
 
         job_name = params.get('job_name', 'banking_pipeline')
         request_id = params.get('request_id', '')
@@ -374,18 +305,21 @@ def run_cai_job():
         )
 
         print(f"\n✅ CAI Job completed successfully!")
-        print(f"Result: {json.dumps(result, indent=2)}")
+        print(f"Result: {dumps(result, indent=True).decode()}")
 
         return result
 
+    except PipelineError:
+        # Already logged by run_pipeline
+        sys.exit(1)
     except Exception as e:
-        print(f"Error in CAI job execution: {e}")
-        traceback.print_exc()
+        logger.exception("Error in CAI job execution: %s: %s", type(e).__name__, e)
         sys.exit(1)
 
 
 def main():
     """Main entry point - prioritizes CAI job mode, falls back to env vars"""
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
 
     # Check if running as CAI job (file_name env var is set)
     if os.environ.get('file_name'):
@@ -436,11 +370,14 @@ Examples:
 
     args = parser.parse_args()
 
-    run_pipeline(
-        input_file=args.input,
-        output_dir=args.output,
-        verbose=args.verbose
-    )
+    try:
+        run_pipeline(
+            input_file=args.input,
+            output_dir=args.output,
+            verbose=args.verbose
+        )
+    except PipelineError:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -24,12 +24,16 @@ Usage for IPython/Jupyter:
     flattener.flatten()
 """
 
-import json
 import csv
+import io
 import os
 import sys
 from pathlib import Path
-from typing import List, Dict, Any, Set
+from typing import List, Dict, Any, Iterable, Set
+
+from banking_flatten_core import (
+    STREAMING_PARSE_ERRORS, _CSV_BUFFER_SIZE, dumps, iter_records, load_file
+)
 
 
 class DataFlattener:
@@ -42,28 +46,37 @@ class DataFlattener:
         """Flatten nested JSON to single flat structure per customer"""
         print(f"Loading data from: {self.input_file}")
 
-        with open(self.input_file, 'r') as f:
-            data = json.load(f)
-
-        flat_records = []
-
-        print(f"Flattening {len(data)} customer records...")
-        for record in data:
-            flat_record = self._flatten_record(record)
-            flat_records.append(flat_record)
-
-        # Write output files
         json_file = self.output_dir / "customers_flat.json"
         csv_file = self.output_dir / "customers_flat.csv"
 
-        self._write_json(json_file, flat_records)
-        self._write_csv(csv_file, flat_records)
+        # The JSON goes to a temporary file that only replaces json_file
+        # once both outputs are written, so a failure leaves no broken file
+        print("Flattening customer records...")
+        tmp_file = json_file.with_name(json_file.name + ".tmp")
+        try:
+            try:
+                flat_records = self._write_json(tmp_file, iter_records(self.input_file))
+            except STREAMING_PARSE_ERRORS:
+                # ijson only takes strict JSON with 64-bit integers; the
+                # whole-file parser also accepts NaN, Infinity and big ints
+                with open(self.input_file, 'rb') as f:
+                    flat_records = self._write_json(tmp_file, load_file(f))
+            print(f"Wrote {len(flat_records)} records to {json_file.name}")
+
+            self._write_csv(csv_file, flat_records)
+            os.replace(tmp_file, json_file)
+        except BaseException:
+            tmp_file.unlink(missing_ok=True)
+            raise
+
+        total_accounts = sum(record["num_accounts"] for record in flat_records)
+        total_transactions = sum(record["num_transactions"] for record in flat_records)
 
         print(f"\nExport complete!")
         print(f"Statistics:")
         print(f"   Total customers: {len(flat_records)}")
-        print(f"   Total accounts: {sum(r['num_accounts'] for r in flat_records)}")
-        print(f"   Total transactions: {sum(r['num_transactions'] for r in flat_records)}")
+        print(f"   Total accounts: {total_accounts}")
+        print(f"   Total transactions: {total_transactions}")
         print(f"\nOutput files:")
         print(f"   {json_file}")
         print(f"   {csv_file}")
@@ -73,11 +86,30 @@ class DataFlattener:
             "csv_file": str(csv_file),
             "stats": {
                 "customers": len(flat_records),
-                "total_accounts": sum(r['num_accounts'] for r in flat_records),
-                "total_transactions": sum(r['num_transactions'] for r in flat_records)
+                "total_accounts": total_accounts,
+                "total_transactions": total_transactions
             }
         }
 
+    def _write_json(
+        self, file_path: Path, records: Iterable[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Flatten records into a JSON array file and return the flat rows
+
+        Each record is flattened and written before the next is read; only
+        the flat rows are kept, for the CSV whose header depends on every
+        row's keys. The layout matches json.dump(indent=2).
+        """
+        flat_records = []
+        with open(file_path, 'wb') as f:
+            for record in records:
+                flat_record = self._flatten_record(record)
+                f.write(b',\n  ' if flat_records else b'[\n  ')
+                f.write(dumps(flat_record, indent=True).replace(b'\n', b'\n  '))
+                flat_records.append(flat_record)
+            f.write(b'\n]' if flat_records else b'[]')
+        return flat_records
+
     def _flatten_record(self, record: Dict[str, Any]) -> Dict[str, Any]:
         """Flatten a single customer record with accounts and transactions
 
@@ -103,14 +135,16 @@ class DataFlattener:
         # Start with customer fields
         flat = dict(customer)
 
-        # Aggregate account information
+        # Aggregate account information in a single pass over the accounts
+        account_types: List[str] = []
+        total_balance = 0
+        for acc in accounts:
+            account_types.append(acc.get("account_type", ""))
+            total_balance += acc.get("current_balance", 0)
+
         flat["num_accounts"] = len(accounts)
-        flat["account_types"] = ", ".join(
-            acc.get("account_type", "") for acc in accounts
-        )
-        flat["total_balance"] = sum(
-            acc.get("current_balance", 0) for acc in accounts
-        )
+        flat["account_types"] = ", ".join(account_types)
+        flat["total_balance"] = total_balance
 
         # Aggregate transaction information
         flat["num_transactions"] = len(transactions)
@@ -118,22 +152,18 @@ class DataFlattener:
         # Get unique transaction categories (preserve order of first occurrence)
         seen_categories: Set[str] = set()
         unique_categories: List[str] = []
+        seen_add = seen_categories.add
+        unique_append = unique_categories.append
         for txn in transactions:
             category = txn.get("transaction_category", "")
             if category and category not in seen_categories:
-                seen_categories.add(category)
-                unique_categories.append(category)
+                seen_add(category)
+                unique_append(category)
 
         flat["sample_transaction_categories"] = ", ".join(unique_categories)
 
         return flat
 
-    def _write_json(self, file_path: Path, data: List[Dict[str, Any]]):
-        """Write list of dicts to JSON file"""
-        with open(file_path, 'w') as f:
-            json.dump(data, f, indent=2)
-        print(f"Wrote {len(data)} records to {file_path.name}")
-
     def _write_csv(self, file_path: Path, data: List[Dict[str, Any]]):
         """Write list of dicts to CSV file"""
         if not data:
@@ -162,10 +192,16 @@ class DataFlattener:
 
         fieldnames = customer_fields + aggregate_fields + extra_fields
 
-        with open(file_path, 'w', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(data)
+        with open(file_path, 'wb', buffering=_CSV_BUFFER_SIZE) as raw, \
+                io.TextIOWrapper(raw, encoding='utf-8', newline='') as f:
+            # Plain csv.writer skips DictWriter's per-row extras check and
+            # dict-to-row conversion; missing fields are written empty, as
+            # DictWriter's default restval did
+            writer = csv.writer(f)
+            writer.writerow(fieldnames)
+            writer.writerows(
+                [record.get(field, "") for field in fieldnames] for record in data
+            )
 
         print(f"Wrote {len(data)} records to {file_path.name}")
 
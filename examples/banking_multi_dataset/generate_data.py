@@ -11,12 +11,42 @@ Usage:
 """
 
 import argparse
+import asyncio
+import httpx
 import json
-import requests
+import os
 import sys
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
 
+# Supported models; unknown names fall back to DEFAULT_MODEL
+MODELS = {
+    "claude-3-5-sonnet": {
+        "model_id": "us.anthropic.claude-3-5-sonnet-20241022-v2:0",
+        "inference_type": "aws_bedrock"
+    },
+    "claude-3-5-haiku": {
+        "model_id": "us.anthropic.claude-3-5-haiku-20241022-v1:0",
+        "inference_type": "aws_bedrock"
+    },
+    "llama-3-70b": {
+        "model_id": "us.meta.llama3-2-70b-instruct-v1:0",
+        "inference_type": "aws_bedrock"
+    },
+    "llama-3-90b": {
+        "model_id": "us.meta.llama3-2-90b-instruct-v1:0",
+        "inference_type": "aws_bedrock"
+    }
+}
+DEFAULT_MODEL = "claude-3-5-haiku"
+
+
+@lru_cache(maxsize=None)
+def _read_text(path: Path) -> str:
+    """Read a file once per process"""
+    return path.read_text()
+
 
 class BankingDataGenerator:
     def __init__(self, api_url="http://localhost:8000"):
@@ -24,38 +54,44 @@ class BankingDataGenerator:
         self.script_dir = Path(__file__).parent
 
     def load_prompt(self):
-        """Load the custom prompt from file"""
-        prompt_path = self.script_dir / "custom_prompt.txt"
-        with open(prompt_path, 'r') as f:
-            return f.read()
+        """Load the custom prompt from file (read once per process)"""
+        return _read_text(self.script_dir / "custom_prompt.txt")
 
     def load_examples(self):
-        """Load example data from file"""
-        examples_path = self.script_dir / "examples.json"
-        with open(examples_path, 'r') as f:
-            return json.load(f)
+        """Load example data from file
+
+        The file is read once per process but parsed on every call, so each
+        caller gets its own copy of the examples.
+        """
+        return json.loads(_read_text(self.script_dir / "examples.json"))
 
     def get_model_config(self, model_name):
         """Get model configuration based on model name"""
-        models = {
-            "claude-3-5-sonnet": {
-                "model_id": "us.anthropic.claude-3-5-sonnet-20241022-v2:0",
-                "inference_type": "aws_bedrock"
-            },
-            "claude-3-5-haiku": {
-                "model_id": "us.anthropic.claude-3-5-haiku-20241022-v1:0",
-                "inference_type": "aws_bedrock"
-            },
-            "llama-3-70b": {
-                "model_id": "us.meta.llama3-2-70b-instruct-v1:0",
-                "inference_type": "aws_bedrock"
-            },
-            "llama-3-90b": {
-                "model_id": "us.meta.llama3-2-90b-instruct-v1:0",
-                "inference_type": "aws_bedrock"
-            }
-        }
-        return models.get(model_name, models["claude-3-5-haiku"])
+        return MODELS.get(model_name, MODELS[DEFAULT_MODEL])
+
+    async def _post_topics(self, request_data, topics, max_concurrent):
+        """Send one single-topic request per topic over a shared client
+
+        At most ``max_concurrent`` requests are in flight at a time. Returns
+        one parsed response per topic, in order; failed requests are
+        returned as their exception.
+        """
+        semaphore = asyncio.Semaphore(max_concurrent)
+
+        async with httpx.AsyncClient(timeout=300) as client:
+            async def post(topic):
+                async with semaphore:
+                    response = await client.post(
+                        f"{self.api_url}/api/v1/synthesize",
+                        json={**request_data, "topics": [topic]}
+                    )
+                    response.raise_for_status()
+                    return response.json()
+
+            return await asyncio.gather(
+                *(post(topic) for topic in topics),
+                return_exceptions=True
+            )
 
     def generate(self, num_customers=10, topics=None, model_name="claude-3-5-haiku",
                  temperature=0.7, output_file=None):
@@ -94,9 +130,11 @@ class BankingDataGenerator:
         print(f"📊 Customers to generate: {num_customers}")
         print(f"🎯 Topics: {', '.join(topics)}")
         print(f"🌡️  Temperature: {temperature}")
-        print(f"\n⏳ Generating data...\n")
+        max_concurrent = min(5, len(topics))
+        print(f"\n⏳ Generating data ({len(topics)} topics, up to {max_concurrent} at a time)...\n")
 
-        # Prepare API request
+        # Prepare API request; sent once per topic, and num_questions is
+        # already a per-topic count on the server
         request_data = {
             "use_case": "custom",
             "model_id": model_config["model_id"],
@@ -105,9 +143,8 @@ class BankingDataGenerator:
             "technique": "freeform",
             "custom_prompt": custom_prompt,
             "example_custom": examples,
-            "topics": topics,
             "is_demo": True,
-            "max_concurrent_topics": min(5, len(topics)),
+            "max_concurrent_topics": 1,
             "model_params": {
                 "temperature": temperature,
                 "top_p": 1.0,
@@ -116,49 +153,27 @@ class BankingDataGenerator:
         }
 
         try:
-            # Make API request
-            response = requests.post(
-                f"{self.api_url}/api/v1/synthesize",
-                json=request_data,
-                timeout=300
+            # Make API requests, one per topic, concurrently
+            results = asyncio.run(
+                self._post_topics(request_data, topics, max_concurrent)
             )
-            response.raise_for_status()
-            result = response.json()
 
-            # Process results
-            if result.get("status") == "completed":
-                print("✅ Generation completed successfully!")
+            qa_pairs = {}
+            completed = 0
+            for topic, result in zip(topics, results):
+                if isinstance(result, Exception):
+                    print(f"❌ {topic}: API request failed: {result}")
+                elif result.get("status") != "completed":
+                    print(f"❌ {topic}: Generation failed: {result.get('error', 'Unknown error')}")
+                else:
+                    completed += 1
+                    for result_topic, records in result.get("qa_pairs", {}).items():
+                        qa_pairs.setdefault(result_topic, []).extend(records)
 
-                # Count statistics
-                total_customers = 0
-                total_accounts = 0
-                total_transactions = 0
+            # Process results
+            if completed:
+                print(f"✅ Generation completed for {completed}/{len(topics)} topics!")
 
-                all_data = []
-                for topic, records in result.get("qa_pairs", {}).items():
-                    for record in records:
-                        # Parse the record if it's in question/solution format
-                        if isinstance(record, dict) and "solution" in record:
-                            try:
-                                data = json.loads(record["solution"])
-                            except json.JSONDecodeError:
-                                continue
-                        else:
-                            data = record
-
-                        all_data.append(data)
-                        total_customers += 1
-                        total_accounts += len(data.get("accounts", []))
-                        total_transactions += len(data.get("transactions", []))
-
-                print(f"\n📈 Statistics:")
-                print(f"   Customers: {total_customers}")
-                print(f"   Accounts: {total_accounts}")
-                print(f"   Transactions: {total_transactions}")
-                print(f"   Avg accounts per customer: {total_accounts/total_customers:.1f}")
-                print(f"   Avg transactions per account: {total_transactions/total_accounts:.1f}")
-
-                # Save to file
                 if output_file is None:
                     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                     output_file = f"banking_data_{timestamp}.json"
@@ -166,8 +181,48 @@ class BankingDataGenerator:
                 output_path = Path(output_file)
                 output_path.parent.mkdir(parents=True, exist_ok=True)
 
-                with open(output_path, 'w') as f:
-                    json.dump(all_data, f, indent=2)
+                # Count statistics
+                total_customers = 0
+                total_accounts = 0
+                total_transactions = 0
+
+                # Save to file: each record is written to the JSON array as
+                # soon as it's parsed, in the same layout as json.dump(indent=2).
+                # The array goes to a temporary file that only replaces
+                # output_path once every record is written and the
+                # statistics have been computed, so a failure leaves no file.
+                tmp_path = output_path.with_name(output_path.name + ".tmp")
+                try:
+                    with open(tmp_path, 'w') as f:
+                        for topic, records in qa_pairs.items():
+                            for record in records:
+                                # Parse the record if it's in question/solution format
+                                if isinstance(record, dict) and "solution" in record:
+                                    try:
+                                        data = json.loads(record["solution"])
+                                    except json.JSONDecodeError:
+                                        continue
+                                else:
+                                    data = record
+
+                                f.write(',\n  ' if total_customers else '[\n  ')
+                                f.write(json.dumps(data, indent=2).replace('\n', '\n  '))
+                                total_customers += 1
+                                total_accounts += len(data.get("accounts", []))
+                                total_transactions += len(data.get("transactions", []))
+                        f.write('\n]' if total_customers else '[]')
+
+                    print(f"\n📈 Statistics:")
+                    print(f"   Customers: {total_customers}")
+                    print(f"   Accounts: {total_accounts}")
+                    print(f"   Transactions: {total_transactions}")
+                    print(f"   Avg accounts per customer: {total_accounts/total_customers:.1f}")
+                    print(f"   Avg transactions per account: {total_transactions/total_accounts:.1f}")
+
+                    os.replace(tmp_path, output_path)
+                except BaseException:
+                    tmp_path.unlink(missing_ok=True)
+                    raise
 
                 print(f"\n💾 Data saved to: {output_path}")
                 print(f"\n✨ Next steps:")
@@ -177,12 +232,9 @@ class BankingDataGenerator:
 
                 return str(output_path)
             else:
-                print(f"❌ Generation failed: {result.get('error', 'Unknown error')}")
+                print("❌ Generation failed for every topic")
                 return None
 
-        except requests.exceptions.RequestException as e:
-            print(f"❌ API request failed: {e}")
-            return None
         except Exception as e:
             print(f"❌ Error: {e}")
             return None
@@ -225,8 +277,8 @@ Examples:
     parser.add_argument(
         "--model",
         type=str,
-        default="claude-3-5-haiku",
-        choices=["claude-3-5-sonnet", "claude-3-5-haiku", "llama-3-70b", "llama-3-90b"],
+        default=DEFAULT_MODEL,
+        choices=list(MODELS),
         help="Model to use for generation (default: claude-3-5-haiku)"
     )
 
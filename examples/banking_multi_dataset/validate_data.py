@@ -11,21 +11,101 @@ Performs local validation checks on generated banking data:
 Usage:
     python validate_data.py --input banking_data.json
     python validate_data.py --input banking_data.json --verbose
+    python validate_data.py --input banking_data.json --workers 4
 """
 
 import argparse
-import json
+import re
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any, Set
+from functools import lru_cache
+from typing import List, Dict, Any, FrozenSet
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from banking_flatten_core import _EMPTY_DICT, load_file
+
+
+# Field and rule tables for the per-record checks, built once instead of
+# on every call
+CUSTOMER_REQUIRED_FIELDS = (
+    "cust_id", "first_name", "last_name", "date_of_birth",
+    "email", "phone", "customer_since", "customer_segment", "credit_score"
+)
+ACCOUNT_REQUIRED_FIELDS = (
+    "account_id", "cust_id", "account_type", "account_status",
+    "open_date", "current_balance", "currency", "interest_rate"
+)
+TRANSACTION_REQUIRED_FIELDS = (
+    "transaction_id", "account_id", "transaction_date",
+    "transaction_type", "amount"
+)
+NON_NEGATIVE_ACCOUNT_TYPES = frozenset({"Savings", "CD", "Money Market"})
+CREDIT_SCORE_MIN = 300
+CREDIT_SCORE_MAX = 850
+
+# Only the first MAX_STORED_MESSAGES errors and warnings are formatted and
+# kept (the summary prints 20); the counts always cover every message. A
+# non-verbose run stops checking records after MAX_ERRORS errors.
+MAX_STORED_MESSAGES = 200
+MAX_ERRORS = 10_000
+
+
+# Matches the start of anything strptime(value, "%Y-%m-%d") could accept
+# (it also allows 1-digit months/days and a space-padded day), so strings
+# that fail it can be rejected without calling strptime
+_YMD_PREFIX = re.compile(r"\d{4}-\d\d?-[ \d]?\d").match
+
+
+@lru_cache(maxsize=None)
+def _parse_ymd(value: str) -> datetime:
+    """Parse a YYYY-MM-DD date; the same dates recur across many records
+
+    Invalid dates raise ValueError with strptime's message.
+    """
+    if not _YMD_PREFIX(value):
+        raise ValueError(f"time data {value!r} does not match format '%Y-%m-%d'")
+    return datetime.strptime(value, "%Y-%m-%d")
+
+
+# Set in each worker process by _init_worker, so the ID sets are sent once
+# per process rather than with every chunk
+_worker_validator = None
+_worker_id_sets = ()
+
+
+def _init_worker(verbose: bool, now: datetime, id_sets: tuple):
+    global _worker_validator, _worker_id_sets
+    _worker_validator = BankingDataValidator(verbose=verbose)
+    _worker_validator._now = now
+    _worker_id_sets = id_sets
+
+
+def _validate_chunk(start: int, records: List[Dict[str, Any]]):
+    """Validate records[start:...] in a worker
+
+    Returns (errors, warnings, error_count, warning_count).
+    """
+    validator = _worker_validator
+    validator.errors = []
+    validator.warnings = []
+    validator.error_count = 0
+    validator.warning_count = 0
+    for idx, record in enumerate(records, start):
+        validator._validate_record(idx, record, *_worker_id_sets)
+    return (validator.errors, validator.warnings,
+            validator.error_count, validator.warning_count)
 
 
 class BankingDataValidator:
-    def __init__(self, verbose=False):
+    def __init__(self, verbose=False, workers=1):
         self.verbose = verbose
+        self.workers = workers
         self.errors = []
         self.warnings = []
+        self.error_count = 0
+        self.warning_count = 0
+        self.records_checked = 0
         self.stats = defaultdict(int)
 
     def validate(self, data: List[Dict[str, Any]]) -> bool:
@@ -37,52 +117,106 @@ class BankingDataValidator:
         """
         print("🔍 Validating banking data...\n")
 
-        # Collect all IDs for referential integrity checks
-        all_customer_ids = set()
-        all_account_ids = set()
-        all_transaction_ids = set()
-
-        for record in data:
-            customer = record.get("customer", {})
-            accounts = record.get("accounts", [])
-            transactions = record.get("transactions", [])
-
-            # Track IDs
-            cust_id = customer.get("cust_id")
-            if cust_id:
-                all_customer_ids.add(cust_id)
-                self.stats["customers"] += 1
-
-            for account in accounts:
-                acc_id = account.get("account_id")
-                if acc_id:
-                    all_account_ids.add(acc_id)
-                    self.stats["accounts"] += 1
-
-            for transaction in transactions:
-                trans_id = transaction.get("transaction_id")
-                if trans_id:
-                    all_transaction_ids.add(trans_id)
-                    self.stats["transactions"] += 1
+        # Reference point for age checks, shared by every record
+        self._now = datetime.now()
+
+        # Collect all IDs for referential integrity checks. Empty IDs are
+        # skipped; the stats count every remaining ID, duplicates included.
+        customer_ids = list(filter(None, [
+            record.get("customer", _EMPTY_DICT).get("cust_id") for record in data
+        ]))
+        account_ids = list(filter(None, [
+            account.get("account_id")
+            for record in data for account in record.get("accounts", ())
+        ]))
+        transaction_ids = list(filter(None, [
+            transaction.get("transaction_id")
+            for record in data for transaction in record.get("transactions", ())
+        ]))
+
+        self.stats["customers"] += len(customer_ids)
+        self.stats["accounts"] += len(account_ids)
+        self.stats["transactions"] += len(transaction_ids)
+
+        # The ID sets are read-only from here on
+        all_customer_ids = frozenset(customer_ids)
+        all_account_ids = frozenset(account_ids)
+        all_transaction_ids = frozenset(transaction_ids)
 
         # Run validation checks
-        for idx, record in enumerate(data):
-            self._validate_record(
-                idx, record, all_customer_ids, all_account_ids, all_transaction_ids
-            )
+        id_sets = (all_customer_ids, all_account_ids, all_transaction_ids)
+        if self.workers > 1 and len(data) > 1:
+            self._validate_parallel(data, id_sets)
+        else:
+            self._validate_records(data, 0, id_sets)
+        self._total_records = len(data)
 
         # Print results
         self._print_results()
 
-        return len(self.errors) == 0
+        return self.error_count == 0
+
+    def _error(self, message: str, *args):
+        """Record an error; message is a str.format template for args"""
+        self.error_count += 1
+        if len(self.errors) < MAX_STORED_MESSAGES:
+            self.errors.append(message.format(*args))
+
+    def _warning(self, message: str, *args):
+        """Record a warning; message is a str.format template for args"""
+        self.warning_count += 1
+        if len(self.warnings) < MAX_STORED_MESSAGES:
+            self.warnings.append(message.format(*args))
+
+    def _validate_records(self, data: List[Dict[str, Any]], start: int, id_sets: tuple):
+        """Validate data[start:] in order, stopping early on hopeless data"""
+        for idx in range(start, len(data)):
+            # Enough evidence that the data is bad; --verbose checks all
+            if self.error_count > MAX_ERRORS and not self.verbose:
+                break
+            self._validate_record(idx, data[idx], *id_sets)
+            self.records_checked = idx + 1
+
+    def _validate_parallel(self, data: List[Dict[str, Any]], id_sets: tuple):
+        """Run the per-record checks in a process pool
+
+        Records are independent once the ID sets are built. Chunks are
+        merged back in input order, so errors and warnings come out the
+        same as a sequential run. The chunk that takes the error count
+        past MAX_ERRORS is re-checked here record by record, so the early
+        stop lands on the same record as well.
+        """
+        chunk_size = max(1, len(data) // (self.workers * 4))
+        starts = range(0, len(data), chunk_size)
+        chunks = (data[start:start + chunk_size] for start in starts)
+
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.verbose, self._now, id_sets)
+        ) as executor:
+            results = executor.map(_validate_chunk, starts, chunks)
+            for start, (errors, warnings, error_count, warning_count) in zip(
+                    starts, results):
+                if self.error_count + error_count > MAX_ERRORS and not self.verbose:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    self._validate_records(data, start, id_sets)
+                    return
+                self.errors.extend(errors[:MAX_STORED_MESSAGES - len(self.errors)])
+                self.warnings.extend(
+                    warnings[:MAX_STORED_MESSAGES - len(self.warnings)]
+                )
+                self.error_count += error_count
+                self.warning_count += warning_count
+                self.records_checked = min(start + chunk_size, len(data))
 
     def _validate_record(
         self,
         idx: int,
         record: Dict[str, Any],
-        all_customer_ids: Set[str],
-        all_account_ids: Set[str],
-        all_transaction_ids: Set[str]
+        all_customer_ids: FrozenSet[str],
+        all_account_ids: FrozenSet[str],
+        all_transaction_ids: FrozenSet[str]
     ):
         """Validate a single customer record"""
         customer = record.get("customer", {})
@@ -104,64 +238,69 @@ class BankingDataValidator:
                 all_customer_ids
             )
 
+        # Index this customer's accounts for the parent-account lookups.
+        # Built in reverse so a duplicated account_id resolves to its first
+        # occurrence, as a front-to-back scan would.
+        acc_by_id = {
+            account.get("account_id"): account for account in reversed(accounts)
+        }
+
         # Validate transactions
         for trans_idx, transaction in enumerate(transactions):
             self._validate_transaction(
                 f"{record_prefix}, Transaction {trans_idx}",
                 transaction,
-                accounts,
+                acc_by_id,
                 all_account_ids
             )
 
     def _validate_customer(self, prefix: str, customer: Dict[str, Any]):
         """Validate customer data"""
-        required_fields = [
-            "cust_id", "first_name", "last_name", "date_of_birth",
-            "email", "phone", "customer_since", "customer_segment", "credit_score"
-        ]
-
-        for field in required_fields:
+        for field in CUSTOMER_REQUIRED_FIELDS:
             if not customer.get(field):
-                self.errors.append(f"{prefix}: Missing required field '{field}'")
+                self._error("{}: Missing required field '{}'", prefix, field)
 
         # Validate credit score
         credit_score = customer.get("credit_score")
         if credit_score:
-            if not isinstance(credit_score, int) or credit_score < 300 or credit_score > 850:
-                self.errors.append(
-                    f"{prefix}: Invalid credit_score {credit_score} (must be 300-850)"
+            if (not isinstance(credit_score, int)
+                    or not CREDIT_SCORE_MIN <= credit_score <= CREDIT_SCORE_MAX):
+                self._error(
+                    "{}: Invalid credit_score {} (must be {}-{})",
+                    prefix, credit_score, CREDIT_SCORE_MIN, CREDIT_SCORE_MAX
                 )
 
         # Validate date format
         dob = customer.get("date_of_birth")
         if dob:
             try:
-                dob_date = datetime.strptime(dob, "%Y-%m-%d")
-                age = (datetime.now() - dob_date).days / 365.25
+                dob_date = _parse_ymd(dob)
+                age = (self._now - dob_date).days / 365.25
                 if age < 18 or age > 120:
-                    self.warnings.append(
-                        f"{prefix}: Unusual age {age:.0f} years"
-                    )
+                    self._warning("{}: Unusual age {:.0f} years", prefix, age)
             except ValueError:
-                self.errors.append(
-                    f"{prefix}: Invalid date_of_birth format '{dob}' (expected YYYY-MM-DD)"
+                self._error(
+                    "{}: Invalid date_of_birth format '{}' (expected YYYY-MM-DD)",
+                    prefix, dob
                 )
 
         # Validate customer_since
         customer_since = customer.get("customer_since")
         if customer_since:
             try:
-                datetime.strptime(customer_since, "%Y-%m-%d")
+                _parse_ymd(customer_since)
             except ValueError:
-                self.errors.append(
-                    f"{prefix}: Invalid customer_since format '{customer_since}'"
+                self._error(
+                    "{}: Invalid customer_since format '{}'",
+                    prefix, customer_since
                 )
 
         # Validate phone format
         phone = customer.get("phone")
         if phone and not phone.startswith("555-"):
-            self.warnings.append(
-                f"{prefix}: Phone '{phone}' doesn't use 555 prefix (privacy guideline)"
+            self._warning(
+                "{}: Phone '{}' doesn't use 555 prefix (privacy guideline)",
+                prefix, phone
             )
 
     def _validate_account(
@@ -169,30 +308,27 @@ class BankingDataValidator:
         prefix: str,
         account: Dict[str, Any],
         customer: Dict[str, Any],
-        all_customer_ids: Set[str]
+        all_customer_ids: FrozenSet[str]
     ):
         """Validate account data"""
-        required_fields = [
-            "account_id", "cust_id", "account_type", "account_status",
-            "open_date", "current_balance", "currency", "interest_rate"
-        ]
-
-        for field in required_fields:
+        for field in ACCOUNT_REQUIRED_FIELDS:
             if account.get(field) is None:
-                self.errors.append(f"{prefix}: Missing required field '{field}'")
+                self._error("{}: Missing required field '{}'", prefix, field)
 
         # Referential integrity: cust_id must exist
         acc_cust_id = account.get("cust_id")
         if acc_cust_id and acc_cust_id not in all_customer_ids:
-            self.errors.append(
-                f"{prefix}: Foreign key violation - cust_id '{acc_cust_id}' not found"
+            self._error(
+                "{}: Foreign key violation - cust_id '{}' not found",
+                prefix, acc_cust_id
             )
 
         # Check cust_id matches parent customer
         if acc_cust_id and customer.get("cust_id") != acc_cust_id:
-            self.errors.append(
-                f"{prefix}: cust_id mismatch - account has '{acc_cust_id}' "
-                f"but parent customer is '{customer.get('cust_id')}'"
+            self._error(
+                "{}: cust_id mismatch - account has '{}' "
+                "but parent customer is '{}'",
+                prefix, acc_cust_id, customer.get("cust_id")
             )
 
         # Temporal consistency
@@ -200,90 +336,89 @@ class BankingDataValidator:
         open_date = account.get("open_date")
         if customer_since and open_date:
             try:
-                cs_date = datetime.strptime(customer_since, "%Y-%m-%d")
-                od_date = datetime.strptime(open_date, "%Y-%m-%d")
+                cs_date = _parse_ymd(customer_since)
+                od_date = _parse_ymd(open_date)
                 if od_date < cs_date:
-                    self.errors.append(
-                        f"{prefix}: Temporal violation - open_date {open_date} "
-                        f"before customer_since {customer_since}"
+                    self._error(
+                        "{}: Temporal violation - open_date {} "
+                        "before customer_since {}",
+                        prefix, open_date, customer_since
                     )
             except ValueError as e:
-                self.errors.append(f"{prefix}: Date parsing error - {e}")
+                self._error("{}: Date parsing error - {}", prefix, e)
 
         # Business logic: Savings accounts can't be negative
         account_type = account.get("account_type")
         balance = account.get("current_balance")
         overdraft = account.get("overdraft_limit", 0)
 
-        if account_type in ["Savings", "CD", "Money Market"] and balance is not None:
+        # The isinstance check keeps an unhashable account_type (a JSON list
+        # or object) from raising TypeError in the frozenset lookup
+        if (isinstance(account_type, str)
+                and account_type in NON_NEGATIVE_ACCOUNT_TYPES
+                and balance is not None):
             if balance < 0:
-                self.errors.append(
-                    f"{prefix}: Business rule violation - {account_type} "
-                    f"has negative balance {balance}"
+                self._error(
+                    "{}: Business rule violation - {} has negative balance {}",
+                    prefix, account_type, balance
                 )
 
         # Checking accounts shouldn't exceed overdraft limit
         if account_type == "Checking" and balance is not None and overdraft is not None:
             if balance < -overdraft:
-                self.errors.append(
-                    f"{prefix}: Business rule violation - balance {balance} "
-                    f"exceeds overdraft_limit {overdraft}"
+                self._error(
+                    "{}: Business rule violation - balance {} "
+                    "exceeds overdraft_limit {}",
+                    prefix, balance, overdraft
                 )
 
         # Closed accounts should have zero balance
         status = account.get("account_status")
         if status == "Closed" and balance != 0:
-            self.warnings.append(
-                f"{prefix}: Closed account has non-zero balance {balance}"
-            )
+            self._warning("{}: Closed account has non-zero balance {}", prefix, balance)
 
         # Interest rate should match account type
         interest_rate = account.get("interest_rate")
         if interest_rate is not None:
             if account_type == "Checking" and interest_rate > 1.0:
-                self.warnings.append(
-                    f"{prefix}: Unusual interest_rate {interest_rate}% for Checking"
+                self._warning(
+                    "{}: Unusual interest_rate {}% for Checking",
+                    prefix, interest_rate
                 )
             elif account_type == "Savings" and interest_rate > 5.0:
-                self.warnings.append(
-                    f"{prefix}: Unusual interest_rate {interest_rate}% for Savings"
+                self._warning(
+                    "{}: Unusual interest_rate {}% for Savings",
+                    prefix, interest_rate
                 )
 
     def _validate_transaction(
         self,
         prefix: str,
         transaction: Dict[str, Any],
-        accounts: List[Dict[str, Any]],
-        all_account_ids: Set[str]
+        acc_by_id: Dict[str, Dict[str, Any]],
+        all_account_ids: FrozenSet[str]
     ):
         """Validate transaction data"""
-        required_fields = [
-            "transaction_id", "account_id", "transaction_date",
-            "transaction_type", "amount"
-        ]
-
-        for field in required_fields:
+        for field in TRANSACTION_REQUIRED_FIELDS:
             if transaction.get(field) is None:
-                self.errors.append(f"{prefix}: Missing required field '{field}'")
+                self._error("{}: Missing required field '{}'", prefix, field)
 
         # Referential integrity: account_id must exist
         trans_acc_id = transaction.get("account_id")
         if trans_acc_id and trans_acc_id not in all_account_ids:
-            self.errors.append(
-                f"{prefix}: Foreign key violation - account_id '{trans_acc_id}' not found"
+            self._error(
+                "{}: Foreign key violation - account_id '{}' not found",
+                prefix, trans_acc_id
             )
 
         # Find parent account
-        parent_account = None
-        for account in accounts:
-            if account.get("account_id") == trans_acc_id:
-                parent_account = account
-                break
+        parent_account = acc_by_id.get(trans_acc_id)
 
         if not parent_account:
-            self.errors.append(
-                f"{prefix}: Transaction references account_id '{trans_acc_id}' "
-                f"not in parent customer's accounts"
+            self._error(
+                "{}: Transaction references account_id '{}' "
+                "not in parent customer's accounts",
+                prefix, trans_acc_id
             )
             return
 
@@ -292,26 +427,29 @@ class BankingDataValidator:
         open_date = parent_account.get("open_date")
         if trans_date and open_date:
             try:
-                td = datetime.strptime(trans_date, "%Y-%m-%d")
-                od = datetime.strptime(open_date, "%Y-%m-%d")
+                td = _parse_ymd(trans_date)
+                od = _parse_ymd(open_date)
                 if td < od:
-                    self.errors.append(
-                        f"{prefix}: Temporal violation - transaction_date {trans_date} "
-                        f"before account open_date {open_date}"
+                    self._error(
+                        "{}: Temporal violation - transaction_date {} "
+                        "before account open_date {}",
+                        prefix, trans_date, open_date
                     )
             except ValueError as e:
-                self.errors.append(f"{prefix}: Date parsing error - {e}")
+                self._error("{}: Date parsing error - {}", prefix, e)
 
         # Validate transaction_type
         trans_type = transaction.get("transaction_type")
         amount = transaction.get("amount")
         if trans_type == "Debit" and amount is not None and amount > 0:
-            self.warnings.append(
-                f"{prefix}: Debit transaction has positive amount {amount}"
+            self._warning(
+                "{}: Debit transaction has positive amount {}",
+                prefix, amount
             )
         elif trans_type == "Credit" and amount is not None and amount < 0:
-            self.warnings.append(
-                f"{prefix}: Credit transaction has negative amount {amount}"
+            self._warning(
+                "{}: Credit transaction has negative amount {}",
+                prefix, amount
             )
 
     def _print_results(self):
@@ -325,29 +463,36 @@ class BankingDataValidator:
         print(f"  Accounts:     {self.stats['accounts']}")
         print(f"  Transactions: {self.stats['transactions']}")
 
-        if self.errors:
-            print(f"\n❌ Errors: {len(self.errors)}")
+        if self.error_count:
+            print(f"\n❌ Errors: {self.error_count}")
             for error in self.errors[:20]:  # Show first 20
                 print(f"  • {error}")
-            if len(self.errors) > 20:
-                print(f"  ... and {len(self.errors) - 20} more errors")
+            if self.error_count > 20:
+                print(f"  ... and {self.error_count - 20} more errors")
 
-        if self.warnings:
-            print(f"\n⚠️  Warnings: {len(self.warnings)}")
+        if self.warning_count:
+            print(f"\n⚠️  Warnings: {self.warning_count}")
             if self.verbose:
                 for warning in self.warnings[:20]:
                     print(f"  • {warning}")
-                if len(self.warnings) > 20:
-                    print(f"  ... and {len(self.warnings) - 20} more warnings")
+                if self.warning_count > 20:
+                    print(f"  ... and {self.warning_count - 20} more warnings")
             else:
                 print(f"  (Use --verbose to see warnings)")
 
-        if not self.errors and not self.warnings:
+        if self.records_checked < self._total_records:
+            print(
+                f"\n⏹️  Stopped after {self.records_checked} of "
+                f"{self._total_records} records (over {MAX_ERRORS} errors); "
+                f"use --verbose to check every record"
+            )
+
+        if not self.error_count and not self.warning_count:
             print("\n✅ All validation checks passed!")
-        elif not self.errors:
-            print(f"\n✅ No critical errors found (but {len(self.warnings)} warnings)")
+        elif not self.error_count:
+            print(f"\n✅ No critical errors found (but {self.warning_count} warnings)")
         else:
-            print(f"\n❌ Validation failed with {len(self.errors)} errors")
+            print(f"\n❌ Validation failed with {self.error_count} errors")
 
 
 def main():
@@ -369,6 +514,13 @@ def main():
         help="Show detailed warnings"
     )
 
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of processes for the per-record checks (default: 1)"
+    )
+
     args = parser.parse_args()
 
     # Load data
@@ -377,11 +529,11 @@ def main():
         print(f"❌ Error: File not found: {input_path}")
         return 1
 
-    with open(input_path, 'r') as f:
-        data = json.load(f)
+    with open(input_path, 'rb') as f:
+        data = load_file(f)
 
     # Validate
-    validator = BankingDataValidator(verbose=args.verbose)
+    validator = BankingDataValidator(verbose=args.verbose, workers=args.workers)
     is_valid = validator.validate(data)
 
     return 0 if is_valid else 1
@@ -0,0 +1,81 @@
+import csv
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "examples" / "banking_multi_dataset"))
+
+from banking_flatten_core import DataFlattener, TRANSACTION_FIELDS, _QUOTING_SAMPLE
+
+
+def _transaction(i, **overrides):
+    row = {
+        "transaction_id": f"T{i}",
+        "account_id": f"A{i % 7}",
+        "transaction_date": "2024-01-20",
+        "transaction_time": "10:24:15",
+        "transaction_type": "Debit" if i % 2 else "Credit",
+        "transaction_category": "Groceries",
+        "amount": -12.5 * i,
+        "merchant_name": "Fairprice Supermarket",
+        "description": "Grocery purchase",
+        "balance_after": 7050.0 + i,
+    }
+    row.update(overrides)
+    return row
+
+
+def _rows(n=20, at=None, **overrides):
+    """n transactions; the one at index ``at`` (if any) gets ``overrides``"""
+    return [_transaction(i, **(overrides if i == at else {})) for i in range(n)]
+
+
+def _dict_writer_bytes(path, data, fieldnames):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(data)
+    return path.read_bytes()
+
+
+@pytest.mark.parametrize("data", [
+    _rows(),
+    _rows(at=3, merchant_name="Cold Storage, Jurong"),
+    _rows(at=3, description='Refund for "damaged" goods'),
+    _rows(at=3, description="line one\nline two"),
+    _rows(at=3, description="carriage\rreturn"),
+    _rows(at=3, merchant_name="", description=None, amount=None),
+    _rows(at=3, merchant_name="Café Ünïcode"),
+    _rows(at=3, amount=True, balance_after=1e20),
+    _rows(at=3, description=["a", "b"]),
+    _rows(at=3, description={"note": "x"}),
+    _rows(at=3, extra_field="dropped"),
+    _rows(n=_QUOTING_SAMPLE + 50, at=_QUOTING_SAMPLE + 10, merchant_name="Late, Comma"),
+    _rows(n=_QUOTING_SAMPLE + 50, at=_QUOTING_SAMPLE + 10, description='late "quote"'),
+], ids=[
+    "plain", "comma", "quote", "newline", "carriage-return", "empty-and-none",
+    "non-ascii", "bool-and-float", "list-value", "dict-value", "extra-key",
+    "comma-after-sample", "quote-after-sample",
+])
+def test_write_csv_matches_dict_writer(tmp_path, data):
+    flattener = DataFlattener(None, str(tmp_path))
+    flattener._write_csv(tmp_path / "fast.csv", data, TRANSACTION_FIELDS)
+    expected = _dict_writer_bytes(tmp_path / "expected.csv", data, TRANSACTION_FIELDS)
+    assert (tmp_path / "fast.csv").read_bytes() == expected
+
+
+def test_write_csv_single_column_empty_values(tmp_path):
+    data = [{"cust_id": ""}, {"cust_id": "C1"}, {}]
+    flattener = DataFlattener(None, str(tmp_path))
+    flattener._write_csv(tmp_path / "fast.csv", data, ("cust_id",))
+    expected = _dict_writer_bytes(tmp_path / "expected.csv", data, ("cust_id",))
+    assert (tmp_path / "fast.csv").read_bytes() == expected
+
+
+def test_write_csv_discovers_fieldnames(tmp_path):
+    data = [{"a": 1, "b": "x, y"}, {"c": None, "a": 2}]
+    flattener = DataFlattener(None, str(tmp_path))
+    flattener._write_csv(tmp_path / "fast.csv", data)
+    expected = _dict_writer_bytes(tmp_path / "expected.csv", data, ["a", "b", "c"])
+    assert (tmp_path / "fast.csv").read_bytes() == expected
@@ -0,0 +1,47 @@
+import csv
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "examples" / "banking_multi_dataset"))
+
+from flatten_to_csv_2 import DataFlattener
+
+
+def _record(cust_id, **customer_fields):
+    return {
+        "customer": {"cust_id": cust_id, "first_name": "Ana", **customer_fields},
+        "accounts": [{"account_id": f"A-{cust_id}", "account_type": "Savings", "current_balance": 10.0}],
+        "transactions": [{"transaction_id": f"T-{cust_id}", "transaction_category": "Groceries"}],
+    }
+
+
+def _flatten(tmp_path, records):
+    input_file = tmp_path / "input.json"
+    input_file.write_text(json.dumps(records))
+    output_dir = tmp_path / "out"
+    DataFlattener(str(input_file), str(output_dir)).flatten()
+    return output_dir
+
+
+def test_csv_includes_columns_the_first_customer_lacks(tmp_path):
+    output_dir = _flatten(tmp_path, [_record("C1"), _record("C2", loyalty_tier="Gold")])
+
+    with open(output_dir / "customers_flat.csv", newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+
+    assert "loyalty_tier" in rows[0]
+    assert [row["loyalty_tier"] for row in rows] == ["", "Gold"]
+
+
+def test_json_rows_keep_customer_keys_as_given(tmp_path):
+    output_dir = _flatten(tmp_path, [_record("C1", region="West"), _record("C2", email="b@x.com")])
+
+    rows = json.loads((output_dir / "customers_flat.json").read_text())
+
+    aggregates = [
+        "num_accounts", "account_types", "total_balance",
+        "num_transactions", "sample_transaction_categories",
+    ]
+    assert list(rows[0]) == ["cust_id", "first_name", "region"] + aggregates
+    assert list(rows[1]) == ["cust_id", "first_name", "email"] + aggregates